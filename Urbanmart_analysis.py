@@ -1,7 +1,6 @@
 # urbanmart_analysis.py
-import os
-import pandas as pd
-from generate_urbanmart_sales import generate_urbanmart_sales
+import pyarrow.parquet as pq
+from generate_urbanmart_sales import ensure_urbanmart_sales, parquet_path_for
 
 def main():
     # 2a) Welcome message using variables and f-strings
@@ -10,12 +9,14 @@ def main():
 
     # Ensure dataset exists
     csv_path = "urbanmart_sales.csv"
-    if not os.path.exists(csv_path):
-        print("Dataset not found. Generating urbanmart_sales.csv ...")
-        generate_urbanmart_sales(out_path=csv_path, n_transactions=25000, seed=42)
+    if ensure_urbanmart_sales(out_path=csv_path, n_transactions=25000, seed=42):
+        print("Dataset not found. Generated urbanmart_sales.csv / .parquet")
 
-    # 2b) Read CSV file using pandas.read_csv()
-    df = pd.read_csv(csv_path)
+    # 2b) Read only the columns the checks below need from the Parquet file
+    df = pq.read_table(
+        parquet_path_for(csv_path),
+        columns=["store_id", "store_location", "product_category", "transaction_type", "date"],
+    ).to_pandas()
 
     # 2c) Basic sanity checks
     print("\n--- Sanity Checks ---")
@@ -24,7 +25,6 @@ def main():
     unique_store_ids = sorted(df["store_id"].dropna().unique().tolist())
     print(f"Unique store IDs: {unique_store_ids}")
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
     print(f"Date range (min to max): {df['date'].min()} to {df['date'].max()}")
 
     # 3) Use basic lists, tuples, and dictionaries
@@ -33,26 +33,17 @@ def main():
     print(product_categories)
 
     # store_id -> store_location dictionary
-    store_map = {}
-    store_rows = df[["store_id", "store_location"]].dropna().drop_duplicates()
-    for _, row in store_rows.iterrows():
-        store_map[row["store_id"]] = row["store_location"]
+    store_rows = df[["store_id", "store_location"]].drop_duplicates().dropna()
+    store_map = dict(zip(store_rows["store_id"].to_numpy(), store_rows["store_location"].to_numpy()))
 
     print("\nStore dictionary (store_id -> store_location):")
     for k in sorted(store_map.keys()):
         print(f"{k} -> {store_map[k]}")
 
-    # Manual loop to count Online vs In-store (no pandas groupby/value_counts)
-    online_count = 0
-    instore_count = 0
-
-    for t in df["transaction_type"].tolist():
-        if isinstance(t, str):
-            tt = t.strip().lower()
-            if tt == "online":
-                online_count += 1
-            elif tt in ("in-store", "instore", "in store"):
-                instore_count += 1
+    # Count Online vs In-store with vectorized string ops (no pandas groupby/value_counts)
+    tt = df["transaction_type"].astype("string").str.strip().str.lower()
+    online_count = int((tt == "online").sum())
+    instore_count = int(tt.isin(["in-store", "instore", "in store"]).sum())
 
     print("\nManual transaction counts:")
     print(f"Online: {online_count:,}")
@@ -1,34 +1,126 @@
 # app.py
-import os
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import streamlit as st
 import altair as alt
 
-from generate_urbanmart_sales import generate_urbanmart_sales
+from generate_urbanmart_sales import ensure_urbanmart_sales, parquet_path_for
 
 st.set_page_config(page_title="UrbanMart Dashboard", layout="wide")
 
 DATA_PATH = "urbanmart_sales.csv"
 
+# Only the columns the dashboard reads; Parquet skips the rest on disk
+USED_COLUMNS = [
+    "transaction_id", "date", "store_id", "store_location", "transaction_type",
+    "customer_id", "customer_segment", "product_category", "quantity", "sales_amount",
+    "day", "weekday",
+]
+DICTIONARY_COLUMNS = ["store_id", "product_category", "transaction_type"]
+# Low-cardinality keys held as pandas categoricals so filters/groupbys work on int codes
+CATEGORY_COLUMNS = ["store_id", "store_location", "transaction_type", "customer_segment", "product_category"]
+
+weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
 # -----------------------
 # Load (or generate) data
 # -----------------------
-@st.cache_data
+# Loaded once per process and shared read-only across reruns/sessions; the frame
+# is never mutated after get_data returns, so no per-rerun copy is needed.
+@st.cache_resource
 def get_data(path: str) -> pd.DataFrame:
-    if not os.path.exists(path):
-        generate_urbanmart_sales(out_path=path, n_transactions=25000, seed=42)
-    df = pd.read_csv(path)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["sales_amount"] = pd.to_numeric(df["sales_amount"], errors="coerce")
-    df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce")
-    return df.dropna(subset=["date", "sales_amount"])
+    ensure_urbanmart_sales(out_path=path, n_transactions=25000, seed=42)
+    # The CSV is an export for humans; the dashboard only reads the Parquet copy
+    table = pq.read_table(parquet_path_for(path), columns=USED_COLUMNS, read_dictionary=DICTIONARY_COLUMNS)
+    df = table.to_pandas()
+    for c in CATEGORY_COLUMNS:
+        df[c] = df[c].astype("category")
+    # Ordered weekday categorical (already so in the Parquet file) makes groupby emit Monday..Sunday
+    df["weekday"] = df["weekday"].astype(pd.CategoricalDtype(weekday_order, ordered=True))
+    df = df.dropna(subset=["date", "sales_amount"])
+    # One row per order, so order counts below are plain row counts (no nunique hashing)
+    assert df["transaction_id"].is_unique
+    return df
 
 df = get_data(DATA_PATH)
 
-# Derived time fields
-df["day"] = df["date"].dt.date
-df["weekday"] = df["date"].dt.day_name()
-df["month"] = df["date"].dt.to_period("M").astype(str)
+# -----------------------
+# Filtered aggregations
+# -----------------------
+# All aggregations are computed in one pass over a single filtered frame and
+# cached on the filter tuple alone, so widgets that don't change the filters
+# (e.g. the Top N slider) skip the groupbys entirely.
+def filter_sales(filters: tuple) -> pd.DataFrame:
+    start_date, end_date, store_sel, cat_sel, channel_sel = filters
+    # Half-open timestamp range keeps the comparison on datetime64 values (no per-row date objects)
+    mask = np.logical_and.reduce([
+        df["date"].between(pd.Timestamp(start_date), pd.Timestamp(end_date) + pd.Timedelta(days=1), inclusive="left").to_numpy(),
+        df["store_id"].isin(store_sel).to_numpy(),
+        df["product_category"].isin(cat_sel).to_numpy(),
+        df["transaction_type"].isin(channel_sel).to_numpy(),
+    ])
+    return df.loc[mask]
+
+def compute_cat_perf(fdf: pd.DataFrame) -> pd.DataFrame:
+    cat_perf = fdf.groupby("product_category", as_index=False, observed=True).agg(
+        revenue=("sales_amount", "sum"),
+        orders=("transaction_id", "size"),
+        units=("quantity", "sum"),
+    )
+    # Distinct customers per category from the deduplicated (category code, uint32 id) pairs
+    customers = (
+        fdf[["product_category", "customer_id"]].drop_duplicates()
+        .groupby("product_category", observed=True).size().rename("customers")
+    )
+    cat_perf = cat_perf.join(customers, on="product_category")
+    cat_perf = cat_perf[["product_category", "revenue", "orders", "customers", "units"]]
+    cat_perf["aov"] = cat_perf["revenue"] / cat_perf["orders"]
+    return cat_perf
+
+def compute_daily(fdf: pd.DataFrame) -> pd.DataFrame:
+    return fdf.groupby("day", as_index=False).agg(revenue=("sales_amount", "sum"))
+
+def compute_store_perf(fdf: pd.DataFrame) -> pd.DataFrame:
+    return fdf.groupby(["store_id", "store_location"], as_index=False, observed=True).agg(
+        revenue=("sales_amount", "sum"),
+        orders=("transaction_id", "size"),
+    )
+
+def compute_weekday_perf(fdf: pd.DataFrame) -> pd.DataFrame:
+    return fdf.groupby("weekday", as_index=False, observed=False).agg(revenue=("sales_amount", "sum"))
+
+def compute_cust(fdf: pd.DataFrame) -> pd.DataFrame:
+    cust = fdf.groupby(["customer_id", "customer_segment"], as_index=False, observed=True).agg(
+        total_spend=("sales_amount", "sum"),
+        orders=("transaction_id", "size"),
+        last_purchase=("date", "max"),
+    )
+    cust["avg_order_value"] = cust["total_spend"] / cust["orders"]
+    return cust.sort_values("total_spend", ascending=False)
+
+def compute_kpis(fdf: pd.DataFrame) -> dict:
+    total_sales = float(fdf["sales_amount"].sum())
+    orders = len(fdf)
+    return {
+        "total_sales": total_sales,
+        "orders": orders,
+        "customers": int(fdf["customer_id"].nunique()),
+        "aov": total_sales / orders if orders else 0.0,
+    }
+
+@st.cache_data
+def compute_aggregates(filters: tuple) -> tuple:
+    fdf = filter_sales(filters)
+    return (
+        compute_kpis(fdf),
+        fdf.head(200),
+        compute_cat_perf(fdf),
+        compute_daily(fdf),
+        compute_store_perf(fdf),
+        compute_weekday_perf(fdf),
+        compute_cust(fdf),
+    )
 
 # -----------------------
 # Sidebar filters
@@ -49,29 +141,19 @@ cat_sel = st.sidebar.multiselect("Category(s)", cats, default=cats)
 channels = sorted(df["transaction_type"].unique().tolist())
 channel_sel = st.sidebar.multiselect("Channel(s)", channels, default=channels)
 
-fdf = df[
-    (df["date"].dt.date >= start_date) &
-    (df["date"].dt.date <= end_date) &
-    (df["store_id"].isin(store_sel)) &
-    (df["product_category"].isin(cat_sel)) &
-    (df["transaction_type"].isin(channel_sel))
-].copy()
+filters = (start_date, end_date, tuple(sorted(store_sel)), tuple(sorted(cat_sel)), tuple(sorted(channel_sel)))
+kpis, preview, cat_perf, daily, store_perf, weekday_perf, cust = compute_aggregates(filters)
 
 # -----------------------
 # Header KPIs
 # -----------------------
 st.title("UrbanMart — Sales Insights Dashboard")
 
-total_sales = float(fdf["sales_amount"].sum())
-orders = int(fdf["transaction_id"].nunique())
-customers = int(fdf["customer_id"].nunique())
-aov = total_sales / orders if orders else 0.0
-
 k1, k2, k3, k4 = st.columns(4)
-k1.metric("Total Sales", f"{total_sales:,.2f}")
-k2.metric("Orders", f"{orders:,}")
-k3.metric("Customers", f"{customers:,}")
-k4.metric("Avg Order Value", f"{aov:,.2f}")
+k1.metric("Total Sales", f"{kpis['total_sales']:,.2f}")
+k2.metric("Orders", f"{kpis['orders']:,}")
+k3.metric("Customers", f"{kpis['customers']:,}")
+k4.metric("Avg Order Value", f"{kpis['aov']:,.2f}")
 
 st.divider()
 
@@ -80,14 +162,6 @@ st.divider()
 # ============================================================
 st.subheader("1) Product Categories Performance")
 
-cat_perf = fdf.groupby("product_category", as_index=False).agg(
-    revenue=("sales_amount", "sum"),
-    orders=("transaction_id", "nunique"),
-    customers=("customer_id", "nunique"),
-    units=("quantity", "sum"),
-)
-cat_perf["aov"] = cat_perf["revenue"] / cat_perf["orders"]
-
 c1, c2 = st.columns([1.15, 1])
 
 with c1:
@@ -112,7 +186,6 @@ st.subheader("2) Sales Variation Across Stores & Days")
 
 left, right = st.columns(2)
 
-daily = fdf.groupby("day", as_index=False).agg(revenue=("sales_amount", "sum"))
 with left:
     st.caption("Daily sales trend")
     line = alt.Chart(daily).mark_line(point=True).encode(
@@ -122,10 +195,6 @@ with left:
     ).properties(height=300)
     st.altair_chart(line, use_container_width=True)
 
-store_perf = fdf.groupby(["store_id", "store_location"], as_index=False).agg(
-    revenue=("sales_amount", "sum"),
-    orders=("transaction_id", "nunique"),
-)
 with right:
     st.caption("Revenue by store")
     bars = alt.Chart(store_perf).mark_bar().encode(
@@ -135,11 +204,6 @@ with right:
     ).properties(height=300)
     st.altair_chart(bars, use_container_width=True)
 
-weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-weekday_perf = fdf.groupby("weekday", as_index=False).agg(revenue=("sales_amount", "sum"))
-weekday_perf["weekday"] = pd.Categorical(weekday_perf["weekday"], categories=weekday_order, ordered=True)
-weekday_perf = weekday_perf.sort_values("weekday")
-
 st.caption("Weekday pattern")
 wd = alt.Chart(weekday_perf).mark_bar().encode(
     x=alt.X("weekday:N", sort=weekday_order, title="Weekday"),
@@ -155,16 +219,9 @@ st.divider()
 # ============================================================
 st.subheader("3) Most Valuable Customers")
 
-cust = fdf.groupby(["customer_id", "customer_segment"], as_index=False).agg(
-    total_spend=("sales_amount", "sum"),
-    orders=("transaction_id", "nunique"),
-    last_purchase=("date", "max"),
-)
-cust["avg_order_value"] = cust["total_spend"] / cust["orders"]
-cust = cust.sort_values("total_spend", ascending=False)
-
 top_n = st.slider("Top N customers", min_value=5, max_value=50, value=10, step=5)
 top = cust.head(top_n)
+top = top.assign(customer_id=top["customer_id"].map(lambda i: f"C{i:05d}"))
 
 c1, c2 = st.columns([1.1, 1])
 
@@ -183,6 +240,6 @@ with c2:
     st.dataframe(top, hide_index=True, use_container_width=True)
 
 with st.expander("Show raw filtered data"):
-    st.dataframe(fdf.head(200), use_container_width=True)
+    st.dataframe(preview, use_container_width=True)
 
 st.caption("Dataset is synthetic and auto-generated for demo/deployment.")
@@ -1,8 +1,16 @@
 # generate_urbanmart_sales.py
+import os
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from datetime import datetime
 
+def parquet_path_for(out_path: str) -> str:
+    """Path of the Parquet copy written next to the CSV at out_path."""
+    return os.path.splitext(out_path)[0] + ".parquet"
+
 def generate_urbanmart_sales(
     out_path: str = "urbanmart_sales.csv",
     n_transactions: int = 25000,
@@ -11,7 +19,8 @@ def generate_urbanmart_sales(
     end_date: str = "2024-12-31"
 ) -> pd.DataFrame:
     """
-    Generate a synthetic UrbanMart transactional dataset and save as CSV.
+    Generate a synthetic UrbanMart transactional dataset and save as CSV,
+    plus a zstd-compressed Parquet copy next to it (same name, .parquet).
 
     Columns:
     - transaction_id
@@ -28,6 +37,7 @@ def generate_urbanmart_sales(
     - discount_pct
     - sales_amount (net)
     - payment_method
+    - day, weekday, month (derived from date)
     """
     rng = np.random.default_rng(seed)
 
@@ -41,7 +51,7 @@ def generate_urbanmart_sales(
         ("S006", "Old Town"),
     ]
     store_ids = np.array([s[0] for s in stores])
-    store_locs = {sid: loc for sid, loc in stores}
+    store_locations = np.array([s[1] for s in stores])
 
     # Categories and products
     catalog = {
@@ -75,32 +85,39 @@ def generate_urbanmart_sales(
 
     # Customer base
     n_customers = 5000
-    customer_ids = np.array([f"C{str(i).zfill(5)}" for i in range(1, n_customers + 1)])
+    # Integer IDs (displayed as C00001...); fixed-width ints hash and store far cheaper than strings
+    customer_ids = np.arange(1, n_customers + 1, dtype=np.uint32)
 
     segments = np.array(["Budget", "Regular", "Premium"])
     segment_probs = np.array([0.35, 0.5, 0.15])
 
-    customer_segment = rng.choice(segments, size=n_customers, p=segment_probs)
-    customer_map = dict(zip(customer_ids, customer_segment))
+    customer_segment_idx = rng.choice(len(segments), size=n_customers, p=segment_probs)
 
     # Date generation
     start = np.datetime64(start_date)
     end = np.datetime64(end_date)
     days = (end - start).astype(int) + 1
-    random_days = rng.integers(0, days, size=n_transactions)
+    # Drawn pre-sorted so rows come out in date order without sorting the frame
+    random_days = np.sort(rng.integers(0, days, size=n_transactions))
     dates = start + random_days.astype("timedelta64[D]")
 
+    # Derived calendar fields, persisted so loaders don't recompute them
+    weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    days_since_epoch = dates.astype("datetime64[D]").astype(np.int64)
+    weekdays = pd.Categorical.from_codes((days_since_epoch + 3) % 7, categories=weekday_order, ordered=True)  # 1970-01-01 was a Thursday
+    months = pd.Categorical(np.datetime_as_string(dates, unit="M"))
+
     # Seasonality / weekday effects (optional)
     # We'll apply a mild weekend uplift by biasing channel and quantity later.
 
     # Store assignment (slight differences)
     store_probs = np.array([0.22, 0.18, 0.20, 0.14, 0.16, 0.10])
-    txn_store_ids = rng.choice(store_ids, size=n_transactions, p=store_probs)
+    store_idx = rng.choice(len(stores), size=n_transactions, p=store_probs)
 
     # Channel assignment
     channels = np.array(["Online", "In-store"])
     channel_probs = np.array([0.35, 0.65])
-    txn_channels = rng.choice(channels, size=n_transactions, p=channel_probs)
+    channel_idx = rng.choice(len(channels), size=n_transactions, p=channel_probs)
 
     # Category assignment influenced by channel (electronics a bit more online)
     base_cat_probs = np.array([0.32, 0.14, 0.16, 0.14, 0.12, 0.12])  # sum=1
@@ -111,94 +128,123 @@ def generate_urbanmart_sales(
     cat_probs_online[categories.tolist().index("Household")] -= 0.02
     cat_probs_online = cat_probs_online / cat_probs_online.sum()
 
-    txn_categories = []
-    for ch in txn_channels:
-        p = cat_probs_online if ch == "Online" else base_cat_probs
-        txn_categories.append(rng.choice(categories, p=p))
-    txn_categories = np.array(txn_categories)
-
-    # Product selection + pricing
-    product_names = []
-    unit_prices = []
-    for cat in txn_categories:
-        items = catalog[cat]
-        idx = rng.integers(0, len(items))
-        name, price = items[idx]
-        # small price noise
-        price = float(np.round(price * rng.uniform(0.95, 1.10), 2))
-        product_names.append(name)
-        unit_prices.append(price)
-
-    product_names = np.array(product_names)
-    unit_prices = np.array(unit_prices, dtype=float)
+    is_online = channel_idx == channels.tolist().index("Online")
+    online_cat_idx = rng.choice(len(categories), size=n_transactions, p=cat_probs_online)
+    base_cat_idx = rng.choice(len(categories), size=n_transactions, p=base_cat_probs)
+    cat_idx = np.where(is_online, online_cat_idx, base_cat_idx)
+
+    # Product selection + pricing (gather from a flattened catalog)
+    item_counts = np.array([len(items) for items in catalog.values()])
+    item_offsets = np.concatenate(([0], np.cumsum(item_counts)[:-1]))
+    names_flat = np.array([name for items in catalog.values() for name, _ in items])
+    prices_flat = np.array([price for items in catalog.values() for _, price in items], dtype=float)
+
+    item_idx = item_offsets[cat_idx] + rng.integers(0, item_counts[cat_idx])
+    product_names = names_flat[item_idx]
+    # small price noise
+    unit_prices = np.round(prices_flat[item_idx] * rng.uniform(0.95, 1.10, size=n_transactions), 2)
 
     # Quantity (higher for groceries/household, lower for electronics)
-    qty = np.ones(n_transactions, dtype=int)
-    for i, cat in enumerate(txn_categories):
-        if cat in ["Groceries", "Beverages", "Household", "Personal Care"]:
-            qty[i] = int(rng.integers(1, 6))  # 1-5
-        elif cat == "Clothing":
-            qty[i] = int(rng.integers(1, 4))  # 1-3
-        else:  # Electronics
-            qty[i] = int(rng.integers(1, 3))  # 1-2
+    # Exclusive upper bound per category, gathered by category code
+    qty_high = {
+        "Groceries": 6, "Beverages": 6, "Household": 6, "Personal Care": 6,  # 1-5
+        "Clothing": 4,  # 1-3
+        "Electronics": 3,  # 1-2
+    }
+    qty = rng.integers(1, np.array([qty_high[c] for c in categories])[cat_idx])
 
     # Discount %
     # More discount on clothing/electronics, less on groceries
-    discount_pct = np.zeros(n_transactions, dtype=float)
-    for i, cat in enumerate(txn_categories):
-        if cat == "Groceries":
-            discount_pct[i] = float(rng.choice([0, 0.05, 0.10], p=[0.75, 0.18, 0.07]))
-        elif cat in ["Beverages", "Household", "Personal Care"]:
-            discount_pct[i] = float(rng.choice([0, 0.05, 0.10, 0.15], p=[0.55, 0.25, 0.15, 0.05]))
-        elif cat == "Clothing":
-            discount_pct[i] = float(rng.choice([0, 0.10, 0.20, 0.30], p=[0.35, 0.35, 0.20, 0.10]))
-        else:  # Electronics
-            discount_pct[i] = float(rng.choice([0, 0.05, 0.10, 0.15, 0.20], p=[0.40, 0.25, 0.20, 0.10, 0.05]))
+    discount_levels = {
+        "Groceries": ([0, 0.05, 0.10], [0.75, 0.18, 0.07]),
+        "Beverages": ([0, 0.05, 0.10, 0.15], [0.55, 0.25, 0.15, 0.05]),
+        "Household": ([0, 0.05, 0.10, 0.15], [0.55, 0.25, 0.15, 0.05]),
+        "Personal Care": ([0, 0.05, 0.10, 0.15], [0.55, 0.25, 0.15, 0.05]),
+        "Clothing": ([0, 0.10, 0.20, 0.30], [0.35, 0.35, 0.20, 0.10]),
+        "Electronics": ([0, 0.05, 0.10, 0.15, 0.20], [0.40, 0.25, 0.20, 0.10, 0.05]),
+    }
+    # (n_categories, max_levels) tables, zero-padded; one uniform draw per row picks
+    # the level through the row's category CDF
+    max_levels = max(len(levels) for levels, _ in discount_levels.values())
+    level_table = np.zeros((len(categories), max_levels))
+    prob_table = np.zeros((len(categories), max_levels))
+    for i, cat in enumerate(categories):
+        levels, probs = discount_levels[cat]
+        level_table[i, :len(levels)] = levels
+        prob_table[i, :len(probs)] = probs
+    cdf_table = np.cumsum(prob_table, axis=1)
+    cdf_table /= cdf_table[:, -1:]
+
+    u = rng.random(n_transactions)
+    level_idx = (u[:, None] >= cdf_table[cat_idx]).sum(axis=1)
+    discount_pct = level_table[cat_idx, level_idx]
 
     # Customer assignment (premium customers slightly more likely to buy electronics)
-    txn_customers = rng.choice(customer_ids, size=n_transactions, replace=True)
-    txn_segments = np.array([customer_map[c] for c in txn_customers])
+    # Sample customer positions so IDs and segments are both plain gathers
+    cust_idx = rng.integers(0, n_customers, size=n_transactions)
+    txn_customers = customer_ids[cust_idx]
+    txn_segment_idx = customer_segment_idx[cust_idx]
 
     # Payment methods
     pm = np.array(["Card", "Cash", "Wallet", "UPI"])
     pm_probs_instore = np.array([0.45, 0.25, 0.15, 0.15])
     pm_probs_online = np.array([0.55, 0.00, 0.25, 0.20])
 
-    payment_methods = []
-    for ch in txn_channels:
-        probs = pm_probs_online if ch == "Online" else pm_probs_instore
-        payment_methods.append(rng.choice(pm, p=probs))
-    payment_methods = np.array(payment_methods)
+    pm_idx = np.where(
+        is_online,
+        rng.choice(len(pm), size=n_transactions, p=pm_probs_online),
+        rng.choice(len(pm), size=n_transactions, p=pm_probs_instore),
+    )
 
     # Sales amount (net)
     gross = unit_prices * qty
     net = np.round(gross * (1 - discount_pct), 2)
 
-    # Transaction IDs
-    txn_ids = np.array([f"T{str(i).zfill(7)}" for i in range(1, n_transactions + 1)])
+    # Transaction IDs (displayed as T0000001...)
+    txn_ids = np.arange(1, n_transactions + 1, dtype=np.uint32)
 
     df = pd.DataFrame({
         "transaction_id": txn_ids,
         "date": pd.to_datetime(dates),
-        "store_id": txn_store_ids,
-        "store_location": [store_locs[s] for s in txn_store_ids],
-        "transaction_type": txn_channels,  # Online / In-store
+        "store_id": pd.Categorical.from_codes(store_idx, categories=store_ids),
+        "store_location": pd.Categorical.from_codes(store_idx, categories=store_locations),
+        "transaction_type": pd.Categorical.from_codes(channel_idx, categories=channels),  # Online / In-store
         "customer_id": txn_customers,
-        "customer_segment": txn_segments,
-        "product_category": txn_categories,
+        "customer_segment": pd.Categorical.from_codes(txn_segment_idx, categories=segments),
+        "product_category": pd.Categorical.from_codes(cat_idx, categories=categories),
         "product_name": product_names,
-        "unit_price": unit_prices,
-        "quantity": qty,
-        "discount_pct": discount_pct,
+        # Narrow dtypes for small-range inputs; sales_amount stays float64 so summed revenue is cent-exact
+        "unit_price": unit_prices.astype(np.float32),
+        "quantity": qty.astype(np.int16),
+        "discount_pct": discount_pct.astype(np.float32),
         "sales_amount": net,
-        "payment_method": payment_methods,
-    }).sort_values("date")
-
-    df.to_csv(out_path, index=False)
+        "payment_method": pd.Categorical.from_codes(pm_idx, categories=pm),
+        "day": dates.astype("datetime64[D]"),
+        "weekday": weekdays,
+        "month": months,
+    })
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pacsv.write_csv(table, out_path)
+    pq.write_table(table, parquet_path_for(out_path), compression="zstd", compression_level=3)
     return df
 
 
+def ensure_urbanmart_sales(out_path: str = "urbanmart_sales.csv", n_transactions: int = 25000, seed: int = 42) -> bool:
+    """
+    Generate the dataset unless its Parquet copy already exists.
+
+    Only the Parquet file counts: a CSV on its own may come from an older
+    generator with a different schema, so it is regenerated (and overwritten).
+    Returns True if the dataset was generated.
+    """
+    if os.path.exists(parquet_path_for(out_path)):
+        return False
+    generate_urbanmart_sales(out_path=out_path, n_transactions=n_transactions, seed=seed)
+    return True
+
+
 if __name__ == "__main__":
     df = generate_urbanmart_sales()
-    print("Generated:", df.shape, "-> urbanmart_sales.csv")
+    print("Generated:", df.shape, "-> urbanmart_sales.csv, urbanmart_sales.parquet")
     print(df.head())